@@ -0,0 +1,810 @@
+import streamlit as st
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.etree
+import lxml.html
+import os
+import base64
+from urllib.parse import urlparse
+import heapq
+import itertools
+from datetime import datetime
+import time
+import orjson
+import zipfile
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Where the probe cache outlives single runs. Set by whoever runs the app, not by
+# its visitors, and shared by every session
+CACHE_DIR = os.environ.get('GUJARAT_SAMACHAR_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'gujarat_samachar_cache'))
+
+# Sessions are threads of one Streamlit process; this serializes their
+# read-merge-write of a shared probe cache file
+CACHE_FILE_LOCK = threading.Lock()
+
+# Article pages are UTF-8 Gujarati; don't let lxml fall back to latin-1
+HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+# First <div> carrying the given class, compiled once instead of per article
+DIV_BY_CLASS_XPATH = lxml.etree.XPath(
+    "(//div[contains(concat(' ', normalize-space(@class), ' '), concat(' ', $cls, ' '))])[1]"
+)
+
+
+def load_json(path):
+    """Parse a JSON file"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def load_json_lines(path):
+    """Parse a JSON Lines file into a list of records"""
+    with open(path, 'rb') as f:
+        return [orjson.loads(line) for line in f if line.strip()]
+
+
+def read_zip_entry(file_path, arcname):
+    """Read a file into a (ZipInfo, bytes) pair ready for ZipFile.writestr"""
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+    with open(file_path, 'rb') as f:
+        return zinfo, f.read()
+
+
+def get_bit(bits, i):
+    """Read bit i of a bytearray bitset"""
+    return bits[i >> 3] >> (i & 7) & 1
+
+
+def set_bit(bits, i):
+    """Set bit i of a bytearray bitset"""
+    bits[i >> 3] |= 1 << (i & 7)
+
+
+def encode_json_value(obj):
+    """orjson fallback for the log and probe cache: bitsets become base64 text, sets sorted lists"""
+    if isinstance(obj, bytearray):
+        return base64.b64encode(obj).decode('ascii')
+    return sorted(obj)
+
+
+class NewspaperScraper:
+    def __init__(self, date_str, temp_dir, cache_dir=None):
+        self.date_str = date_str
+        self.temp_dir = temp_dir
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+
+        self.base_folder = os.path.join(temp_dir, 'gujarat_samachar_images')
+        self.date_folder = os.path.join(self.base_folder, self.date_str)
+        self.article_url_base = f'https://epaper.gujaratsamachar.com/view_article/ahmedabad/{self.date_str}/'
+        self.log_file = os.path.join(temp_dir, 'scraping_log.json')
+        self.metadata_file = os.path.join(temp_dir, 'article_metadata.jsonl')
+        # What is known about pages without an article outlives a single run's
+        # temp_dir when cache_dir points somewhere persistent
+        self.cache_dir = cache_dir or temp_dir
+        self.cache_file = os.path.join(self.cache_dir, 'probe_cache.json')
+        self.consecutive_failures = 0
+        self.max_consecutive_failures = 10
+        # Misses in a row across jump waves before a page is given up as empty.
+        # Giving up skips the finer strides and loses any article no coarser
+        # stride landed on, so ranges of up to full_sweep_ids IDs are always
+        # searched down to stride 1 and only larger ones are cut short
+        self.max_page_misses = 250
+        self.full_sweep_ids = 1000
+        # Remembered misses and their ETags are dropped after this many seconds, so
+        # pages that were not published yet or served an error page get probed again
+        self.tried_ids_ttl = 60 * 60
+        self.flush_interval = 5
+        self.flush_every = 25
+        self._dirty = False
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._image_files = {}  # path inside the ZIP -> downloaded file
+        self._unsaved_metadata = []
+        self._warnings = []  # raised on worker threads, shown by show_warnings
+        self.zip_read_ahead = 8
+        self.head_probes = True
+        self.max_head_misleads = 25
+        self._head_misleads = 0
+        # HEAD 404s are double-checked with a GET until this many agree
+        self.head_404_checks = 3
+        self._head_404s_confirmed = 0
+        self.max_workers = 50
+        self.neighbor_window = 40
+        # Each stride divides the one before it, so every ID a coarser pass probed
+        # is on the finer grid too and finer passes only fetch the IDs in between
+        self.jump_sizes = [100, 50, 10, 5, 1]
+        self._lock = threading.Lock()
+
+        # Reuse keep-alive connections for every request. Article pages and images
+        # may come from different hosts, so keep a pool per host, each large enough
+        # for every worker thread.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Instead of sleeping between requests, back off exponentially only when the
+        # server says it is overloaded or a gateway fails
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.max_workers, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Create the folder for this date's images once, not per download
+        os.makedirs(self.date_folder, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Initialize logs and metadata
+        self.successful_urls = self.load_log()
+        self.metadata = self.load_metadata()
+        self.probe_cache = self.load_cache()
+
+    def close(self):
+        """Release the pooled HTTP connections"""
+        self.session.close()
+
+    def load_log(self):
+        """Load or create the log file"""
+        default_log = {
+            'successful_urls': set(),
+            'stats': {
+                'total_downloaded': 0,
+                'last_successful_date': None,
+                'article_ids_by_page': {},
+                'last_successful_ids': {}
+            }
+        }
+
+        try:
+            if os.path.exists(self.log_file):
+                log = load_json(self.log_file)
+                # Membership is checked for every probed ID, so keep URLs and IDs in sets
+                log['successful_urls'] = set(log['successful_urls'])
+                log['stats']['article_ids_by_page'] = {
+                    page: set(ids) for page, ids in log['stats']['article_ids_by_page'].items()
+                }
+                return log
+            return default_log
+        except Exception as e:
+            st.error(f"Error loading log file: {e}")
+            return default_log
+
+    def load_metadata(self):
+        """Load or create the metadata file"""
+        try:
+            if os.path.exists(self.metadata_file):
+                rows = load_json_lines(self.metadata_file)
+                return {f"{row['page_number']}_{row['article_id']}": row for row in rows}
+            return {}
+        except Exception as e:
+            st.error(f"Error loading metadata file: {e}")
+            return {}
+
+    def load_cache(self):
+        """
+        Load or create the probe cache: remembered misses of article pages and
+        their ETags, per date and page. Expired entries are dropped.
+        """
+        default_cache = {
+            'pages': {}
+        }
+
+        try:
+            if os.path.exists(self.cache_file):
+                cache = load_json(self.cache_file)
+                now = time.time()
+                pages = {
+                    key: entry for key, entry in cache.get('pages', {}).items()
+                    if now - entry['created'] <= self.tried_ids_ttl
+                }
+                for entry in pages.values():
+                    entry['bits'] = bytearray(base64.b64decode(entry['bits']))
+                return {'pages': pages}
+            return default_cache
+        except Exception as e:
+            st.error(f"Error loading probe cache: {e}")
+            return default_cache
+
+    def _write_atomic(self, path, data):
+        """Write data to path via a temp file so readers never see a half-written file"""
+        with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path), delete=False) as f:
+            f.write(data)
+        os.replace(f.name, path)
+
+    def save_log(self):
+        """Save the log file"""
+        try:
+            self._write_atomic(self.log_file, orjson.dumps(self.successful_urls, default=encode_json_value))
+        except Exception as e:
+            st.error(f"Error saving log file: {e}")
+
+    def save_cache(self):
+        """
+        Save the probe cache, merged into what other runs wrote to the file since
+        it was loaded so concurrent sessions don't drop each other's entries
+        """
+        try:
+            with CACHE_FILE_LOCK:
+                pages = self.load_cache()['pages']
+                with self._lock:
+                    for key, entry in self.probe_cache['pages'].items():
+                        other = pages.get(key)
+                        if other and other['start'] == entry['start'] and len(other['bits']) == len(entry['bits']):
+                            entry = {
+                                'created': min(entry['created'], other['created']),
+                                'start': entry['start'],
+                                'bits': bytearray(a | b for a, b in zip(entry['bits'], other['bits'])),
+                                'etags': {**other['etags'], **entry['etags']}
+                            }
+                        pages[key] = entry
+                    data = orjson.dumps({'pages': pages}, default=encode_json_value)
+                self._write_atomic(self.cache_file, data)
+        except Exception as e:
+            st.error(f"Error saving probe cache: {e}")
+
+    def save_metadata(self):
+        """Append metadata for articles downloaded since the last save, one JSON object per line"""
+        try:
+            with open(self.metadata_file, 'ab') as f:
+                f.write(b''.join(orjson.dumps(row) + b'\n' for row in self._unsaved_metadata))
+            self._unsaved_metadata.clear()
+        except Exception as e:
+            st.error(f"Error saving metadata file: {e}")
+
+    def _maybe_flush(self):
+        """
+        Write the log, metadata and probe cache files if they changed and either
+        flush_every articles were downloaded or flush_interval seconds passed since
+        the last write
+        """
+        if self._pending < self.flush_every and time.monotonic() - self._last_flush < self.flush_interval:
+            return
+        self.flush()
+
+    def flush(self):
+        """Write the log, metadata and probe cache files if they changed"""
+        if not self._dirty:
+            return
+
+        self.save_metadata()
+        self.save_log()
+        self.save_cache()
+        self._dirty = False
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def get_article_metadata(self, tree, url, article_id, page):
+        """Extract metadata from article page with page information"""
+        metadata = {
+            'url': url,
+            'article_id': article_id,
+            'page_number': page,
+            'title': '',
+            'date_scraped': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        try:
+            title_elems = DIV_BY_CLASS_XPATH(tree, cls='article_title')
+            if title_elems:
+                metadata['title'] = title_elems[0].text_content().strip()
+
+            content_elems = DIV_BY_CLASS_XPATH(tree, cls='article_text')
+            if content_elems:
+                metadata['content'] = content_elems[0].text_content().strip()
+        except Exception as e:
+            # Runs on worker threads, where Streamlit calls are dropped
+            with self._lock:
+                self._warnings.append(f"Error extracting metadata: {e}")
+
+        return metadata
+
+    def show_warnings(self):
+        """Display warnings collected on worker threads; call from the script thread"""
+        with self._lock:
+            warnings, self._warnings = self._warnings, []
+        for warning in warnings:
+            st.warning(warning)
+
+    def _count_failure(self):
+        """Count a failed request towards consecutive_failures from any thread"""
+        with self._lock:
+            self.consecutive_failures += 1
+
+    def probe_exists(self, url):
+        """
+        Check an article page with a bodiless HEAD request.
+        Returns False only when the server reports the page as missing.
+        """
+        if not self.head_probes:
+            return True
+
+        response = self.session.head(url, timeout=5, allow_redirects=True)
+        if response.status_code in (404, 410):
+            with self._lock:
+                self._head_misleads = 0
+                trusted = self._head_404s_confirmed >= self.head_404_checks
+            if trusted:
+                return False
+
+            # Some servers answer HEAD with 404 even for real pages, which would
+            # hide every article from the coarse waves, so check with a GET first
+            page_response = self.session.get(url, timeout=10)
+            if page_response.status_code == 200 and b'current_artical' in page_response.content:
+                with self._lock:
+                    self.head_probes = False
+                return True
+            if page_response.status_code in (200, 404, 410):
+                with self._lock:
+                    self._head_404s_confirmed += 1
+                return False
+            return True
+        if response.status_code == 405:
+            with self._lock:
+                self.head_probes = False
+        return True
+
+    def page_cache(self, page):
+        """
+        Probe cache entry for this date's page, holding the tried-ID bitset and
+        the ETags of pages without an article. An entry older than tried_ids_ttl
+        seconds is started over, ETags included.
+        """
+        key = f"{self.date_str}_{page}"
+        with self._lock:
+            entry = self.probe_cache['pages'].get(key)
+            if entry is None or time.time() - entry['created'] > self.tried_ids_ttl:
+                entry = {'created': time.time(), 'start': 0, 'bits': bytearray(), 'etags': {}}
+                self.probe_cache['pages'][key] = entry
+            return entry
+
+    def _remember_miss(self, page, article_id, response):
+        """Keep the ETag of a page without an article so later runs can revalidate it"""
+        etag = response.headers.get('ETag')
+        if etag:
+            entry = self.page_cache(page)
+            with self._lock:
+                entry['etags'][str(article_id)] = etag
+                self._dirty = True
+
+    def download_image(self, url, folder_path, page, article_id, head_first=False):
+        """
+        Download image from article page into the page-specific folder_path.
+        With head_first, the page is checked with probe_exists before it is fetched.
+        """
+        try:
+            if url in self.successful_urls['successful_urls']:
+                return False, "Already downloaded"
+
+            # Only misses keep an ETag, so a 304 means the page still has no article
+            etag = self.page_cache(page)['etags'].get(str(article_id))
+            if head_first and not etag and not self.probe_exists(url):
+                self._count_failure()
+                return False, "Not found"
+
+            headers = {'If-None-Match': etag} if etag else None
+            response = self.session.get(url, headers=headers, timeout=10)
+
+            if response.status_code == 304:
+                return False, "Not modified"
+
+            if response.status_code in (404, 410):
+                self._count_failure()
+                return False, "Not found"
+
+            if response.status_code != 200:
+                self._count_failure()
+                return False, f"HTTP {response.status_code}"
+
+            # Most probed IDs are misses; rule them out with a byte scan before parsing
+            if b'current_artical' not in response.content:
+                # If HEAD keeps approving pages that turn out to be misses, the server
+                # answers 200 for every ID and the extra request is pure overhead
+                if head_first and self.head_probes:
+                    with self._lock:
+                        self._head_misleads += 1
+                        if self._head_misleads >= self.max_head_misleads:
+                            self.head_probes = False
+                self._remember_miss(page, article_id, response)
+                return False, "No image found"
+
+            tree = lxml.html.fromstring(response.content, parser=HTML_PARSER)
+            img_tag = tree.get_element_by_id('current_artical', None)
+
+            if img_tag is None or img_tag.get('src') is None:
+                self._remember_miss(page, article_id, response)
+                return False, "No image found"
+
+            img_url = img_tag.get('src')
+
+            # Stream the image to disk in 64 KiB chunks so memory use stays flat
+            # however large the scan is; the with block returns the connection
+            # to the pool as soon as the body is read
+            with self.session.get(img_url, timeout=10, stream=True) as img_response:
+                if img_response.status_code != 200:
+                    return False, "Failed to download image"
+
+                ext = os.path.splitext(urlparse(img_url).path)[1]
+                if not ext:
+                    ext = '.jpeg'
+
+                filename = f'page{page}_article_{article_id}{ext}'
+                filepath = os.path.join(folder_path, filename)
+
+                # A 1 MiB buffer holds a typical page image, so it lands in one write
+                with open(filepath, 'wb', buffering=1 << 20) as f:
+                    for chunk in img_response.iter_content(1 << 16):
+                        f.write(chunk)
+
+            arcname = os.path.relpath(filepath, self.temp_dir)
+            metadata = self.get_article_metadata(tree, url, article_id, page)
+
+            # Downloads run concurrently, so serialize updates to shared state
+            with self._lock:
+                self._image_files[arcname] = filepath
+                self.metadata[f"{page}_{article_id}"] = metadata
+                self._unsaved_metadata.append(metadata)
+
+                self.consecutive_failures = 0
+                self._head_misleads = 0
+                self.successful_urls['successful_urls'].add(url)
+                self.successful_urls['stats']['article_ids_by_page'].setdefault(str(page), set()).add(article_id)
+
+                self.successful_urls['stats']['last_successful_ids'][str(page)] = article_id
+                self.successful_urls['stats']['total_downloaded'] += 1
+                self.successful_urls['stats']['last_successful_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                self._dirty = True
+                self._pending += 1
+
+            return True, filepath
+
+        except Exception as e:
+            self._count_failure()
+            return False, str(e)
+
+    def search_around_id(self, page, start_id, search_range=50):
+        """
+        Search for articles around the given ID.
+        When a successful article is found, extend search by 10 IDs in both directions.
+        """
+        folder_path = self.date_folder
+        url_prefix = f'{self.article_url_base}{page}/'
+        successful_downloads = []
+        found_ids = set()  # Keep track of found article IDs
+        # Min-heap of IDs still to probe, plus every ID ever queued so none is probed twice
+        ids_to_search = list(range(start_id - search_range, start_id + search_range + 1))
+        queued_ids = set(ids_to_search)
+
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        search_stats = st.empty()
+
+        while ids_to_search and self.consecutive_failures < self.max_consecutive_failures:
+            current_id = heapq.heappop(ids_to_search)  # Start from lowest ID
+
+            url = url_prefix + str(current_id)
+            status_text.text(f"Trying URL: {url}")
+
+            success, result = self.download_image(url, folder_path, page, current_id)
+            self.show_warnings()
+
+            if success:
+                successful_downloads.append({
+                    'article_id': current_id,
+                    'url': url,
+                    'filepath': result
+                })
+                found_ids.add(current_id)
+
+                # Add 10 more IDs to search in both directions, skipping any already queued
+                for new_id in itertools.chain(range(current_id - 10, current_id), range(current_id + 1, current_id + 11)):
+                    if new_id not in queued_ids:
+                        queued_ids.add(new_id)
+                        heapq.heappush(ids_to_search, new_id)
+
+                # Reset consecutive failures counter
+                self.consecutive_failures = 0
+
+                # Update search statistics
+                search_stats.text(f"""
+                Found articles: {len(successful_downloads)}
+                Remaining IDs to search: {len(ids_to_search)}
+                Last successful ID: {current_id}
+                """)
+
+            # Update progress based on total searched vs total to search
+            total_searched = len(found_ids) + len(ids_to_search)
+            progress = len(found_ids) / total_searched if total_searched > 0 else 0
+            progress_bar.progress(progress)
+
+            self._maybe_flush()
+
+        self.flush()
+
+        if self.consecutive_failures >= self.max_consecutive_failures:
+            status_text.text(f"Stopping search after {self.max_consecutive_failures} consecutive failures")
+        else:
+            status_text.text("Completed search for this page")
+
+        # Sort downloads by article ID for better organization
+        successful_downloads.sort(key=lambda x: x['article_id'])
+
+        # Display final statistics for this page
+        if found_ids:
+            st.write(f"""
+            ### Page {page} Summary
+            - Total articles found: {len(successful_downloads)}
+            - ID range: {min(found_ids)} to {max(found_ids)}
+            - Search expanded {len(queued_ids) - (2 * search_range + 1)} additional IDs
+            """)
+        else:
+            st.write(f"""
+            ### Page {page} Summary
+            - No articles found
+            - Search range: {start_id - search_range} to {start_id + search_range}
+            """)
+
+        return successful_downloads
+
+    def tried_ids(self, page, start_range, end_range):
+        """
+        Bitset of the IDs in start_range..end_range known to be misses on this page,
+        one bit per ID, kept in the page's probe cache entry so later runs skip them.
+        Bits recorded over a different range carry over where the two ranges overlap.
+        """
+        entry = self.page_cache(page)
+        size = (end_range - start_range) // 8 + 1
+        if entry['start'] == start_range and len(entry['bits']) == size:
+            return entry['bits']
+
+        bits = bytearray(size)
+        old_start, old_bits = entry['start'], entry['bits']
+        for article_id in range(max(start_range, old_start), min(end_range + 1, old_start + len(old_bits) * 8)):
+            if get_bit(old_bits, article_id - old_start):
+                set_bit(bits, article_id - start_range)
+        entry['start'], entry['bits'] = start_range, bits
+        return bits
+
+    def probe_ids(self, executor, page, article_ids, url_prefix, folder_path, head_first=False):
+        """
+        Download a batch of article IDs concurrently.
+        Returns (article_id, url, success, result) tuples in ID order.
+        """
+        article_ids = sorted(article_ids)
+        urls = [url_prefix + str(article_id) for article_id in article_ids]
+        results = executor.map(
+            lambda args: self.download_image(args[1], folder_path, page, args[0], head_first),
+            zip(article_ids, urls)
+        )
+        return [
+            (article_id, url, success, result)
+            for article_id, url, (success, result) in zip(article_ids, urls, results)
+        ]
+
+    def jump_search_for_page(self, page, start_range=348000, end_range=348999):
+        """
+        Jump search implementation with page-specific URL handling.
+        Each jump cycle is probed as one concurrent wave, followed by waves that
+        sweep the neighborhoods of every hit from that cycle together.
+        """
+        if end_range < start_range:
+            st.error(f"End range {end_range} is below start range {start_range}")
+            return []
+
+        status_text = st.empty()
+        progress_bar = st.progress(0)
+        search_stats = st.empty()
+
+        # Constant for the whole page, so build them once instead of per probe
+        url_prefix = f'{self.article_url_base}{page}/'
+        folder_path = os.path.join(self.date_folder, f'page_{page}')
+        os.makedirs(folder_path, exist_ok=True)
+
+        found_articles = []
+        # IDs an earlier run confirmed as misses count as already searched, but
+        # only this run's probes count towards max_page_misses
+        tried = self.tried_ids(page, start_range, end_range)
+        outcomes = {  # article ID -> whether it was an article
+            i: False for i in range(start_range, end_range + 1) if get_bit(tried, i - start_range)
+        }
+        searched_ids = set(outcomes)
+        jump_size = self.jump_sizes[0]
+        current_id = start_range
+        consecutive_failures = 0
+        last_ui = 0.0
+
+        def update_stats(force=False):
+            # Every widget update is a frame over the websocket, so redraw the
+            # stats at most every 0.25s, and only between waves
+            nonlocal last_ui
+            now = time.monotonic()
+            if not force and now - last_ui <= 0.25:
+                return
+            last_ui = now
+
+            search_stats.markdown(
+                f"Current jump size: {jump_size}  \n"
+                f"IDs searched: {len(searched_ids)}  \n"
+                f"Articles found: {len(found_articles)}  \n"
+                f"Current ID: {current_id}  \n"
+                f"Consecutive failures: {consecutive_failures}"
+            )
+            progress = len(searched_ids) / (end_range - start_range + 1)
+            progress_bar.progress(min(progress, 1.0))
+
+        def record_misses(wave_results):
+            # Only definite misses are remembered; errors and throttled requests get retried next run
+            for article_id, _, success, result in wave_results:
+                if not success and result in ("Not found", "No image found", "Not modified"):
+                    set_bit(tried, article_id - start_range)
+                    self._dirty = True
+
+        def report_wave(label, wave_results):
+            # One line per wave instead of one per probed ID; only hits get links
+            links = [f"[ID {article_id}]({url})" for article_id, url, success, _ in wave_results if success]
+            st.write(f"Page {page}, {label}: searched {len(wave_results)} IDs, found {', '.join(links) or 'none'}")
+            self.show_warnings()
+            update_stats(force=bool(links))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for jump_size in self.jump_sizes:
+                status_text.text(f"Searching page {page} with jump size: {jump_size}")
+                found_article_in_cycle = False
+
+                wave = [i for i in range(start_range, end_range + 1, jump_size) if i not in searched_ids]
+                hits = []
+                # The coarse wave is mostly misses, so check existence with HEAD first
+                wave_results = self.probe_ids(executor, page, wave, url_prefix, folder_path, head_first=True)
+                for current_id, url, success, result in wave_results:
+                    searched_ids.add(current_id)
+                    outcomes[current_id] = success
+
+                    if success:
+                        found_article_in_cycle = True
+                        found_articles.append({
+                            'page': page,
+                            'article_id': current_id,
+                            'url': url,
+                            'filepath': result
+                        })
+                        hits.append(current_id)
+
+                record_misses(wave_results)
+                report_wave(f"jump size {jump_size}", wave_results)
+
+                # Nearest neighbor search within the same page. Every hit gets a window
+                # of IDs on both sides, and the windows of all hits are probed as one
+                # batch; a side keeps sweeping outward until it ends in 10 consecutive
+                # misses or leaves the search range.
+                edges = {(hit, step): hit for hit in hits for step in (1, -1)}
+                misses = dict.fromkeys(edges, 0)
+
+                while edges:
+                    windows = {
+                        (hit, step): [
+                            edge + step * k for k in range(1, self.neighbor_window)
+                            if start_range <= edge + step * k <= end_range
+                        ]
+                        for (hit, step), edge in edges.items()
+                    }
+                    neighbor_ids = {i for ids in windows.values() for i in ids if i not in searched_ids}
+                    status_text.text(f"Checking page {page}, {len(neighbor_ids)} neighbors of {len(hits)} articles")
+
+                    neighbor_results = self.probe_ids(executor, page, neighbor_ids, url_prefix, folder_path)
+                    for current_id, neighbor_url, success, result in neighbor_results:
+                        searched_ids.add(current_id)
+                        outcomes[current_id] = success
+
+                        if success:
+                            found_articles.append({
+                                'page': page,
+                                'article_id': current_id,
+                                'url': neighbor_url,
+                                'filepath': result
+                            })
+
+                    for side, ids in windows.items():
+                        for neighbor_id in ids:
+                            if misses[side] >= 10:
+                                break
+                            misses[side] = 0 if outcomes[neighbor_id] else misses[side] + 1
+
+                        if misses[side] >= 10 or len(ids) < self.neighbor_window - 1:
+                            del edges[side]
+                        else:
+                            edges[side] = ids[-1]
+
+                    consecutive_failures = max((misses[side] for side in edges), default=0)
+                    if neighbor_results:
+                        record_misses(neighbor_results)
+                        report_wave("neighbors", neighbor_results)
+
+                self._maybe_flush()
+
+                if found_article_in_cycle:
+                    break
+                status_text.text(f"No articles found on page {page} with jump size {jump_size}")
+
+                # Waves without a single hit add up. Past the limit a large range is
+                # most likely an unpublished page, so skip the finer strides, at the
+                # cost of articles that only a finer stride would reach
+                consecutive_failures += len(wave_results)
+                if consecutive_failures >= self.max_page_misses and end_range - start_range + 1 > self.full_sweep_ids:
+                    status_text.text(f"Stopping page {page} after {consecutive_failures} consecutive misses")
+                    break
+
+        update_stats(force=True)
+        self.flush()
+
+        # Sort found articles by ID within the page
+        found_articles.sort(key=lambda x: x['article_id'])
+
+        # Display page-specific summary
+        if found_articles:
+            st.write(f"""
+            ### Page {page} Summary
+            - Total articles found: {len(found_articles)}
+            - ID range: {min(a['article_id'] for a in found_articles)} to {max(a['article_id'] for a in found_articles)}
+            - Total IDs searched: {len(searched_ids)}
+            """)
+        else:
+            st.write(f"""
+            ### Page {page} Summary
+            - No articles found
+            - IDs searched: {len(searched_ids)}
+            """)
+
+        return found_articles
+
+    def create_zip_file(self):
+        """Create a zip file of all downloaded content"""
+        zip_path = os.path.join(self.temp_dir, f'gujarat_samachar_{self.date_str}.zip')
+        self.flush()
+
+        try:
+            # Images are already compressed, so only the JSON files are deflated
+            # A 64 KiB write buffer coalesces the many small header/data writes per entry
+            with open(zip_path, 'wb', buffering=1 << 16) as buf, \
+                    zipfile.ZipFile(buf, 'w', zipfile.ZIP_STORED) as zipf:
+                # Add images. Worker threads read the next few files ahead while this
+                # thread writes entries in order; at most zip_read_ahead files are
+                # held in memory at once.
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    pending = deque()
+                    for arcname, file_path in self._image_files.items():
+                        pending.append(executor.submit(read_zip_entry, file_path, arcname))
+                        if len(pending) >= self.zip_read_ahead:
+                            zipf.writestr(*pending.popleft().result())
+                    while pending:
+                        zipf.writestr(*pending.popleft().result())
+
+                # Add metadata and log files
+                if os.path.exists(self.metadata_file):
+                    zipf.write(
+                        self.metadata_file,
+                        os.path.basename(self.metadata_file),
+                        compress_type=zipfile.ZIP_DEFLATED,
+                        compresslevel=1
+                    )
+                if os.path.exists(self.log_file):
+                    zipf.write(
+                        self.log_file,
+                        os.path.basename(self.log_file),
+                        compress_type=zipfile.ZIP_DEFLATED,
+                        compresslevel=1
+                    )
+
+            return zip_path
+        except Exception as e:
+            st.error(f"Error creating zip file: {e}")
+            return None
+
+
+def extract_article_id(url):
+    """Extract article ID from the URL"""
+    _, sep, tail = url.rpartition('/')
+    if sep and tail.isdecimal():
+        return int(tail)
+    return None